@@ -0,0 +1,241 @@
+import os
+import re
+import zlib
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+from doc_utils import extract_text_from_file
+
+# MinHash / LSH configuration
+SHINGLE_SIZE = 5          # words per shingle
+NUM_PERM = 128            # signature length
+DUPLICATE_THRESHOLD = 0.8 # estimated Jaccard similarity to count as a near-duplicate
+LSH_RECALL = 0.99         # minimum chance that a pair at the threshold becomes an LSH candidate
+MINHASH_BLOCK_SIZE = 4096 # shingles hashed per block, bounds peak memory per document
+
+_MERSENNE_PRIME = np.uint64((1 << 31) - 1)
+_rng = np.random.RandomState(42)
+_PERM_A = _rng.randint(1, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, (1 << 31) - 1, size=NUM_PERM).astype(np.uint64)
+
+def shingle_text(text: str, k: int = SHINGLE_SIZE) -> Set[str]:
+    """
+    Split text into a set of overlapping k-word shingles.
+
+    Args:
+        text (str): Raw document text
+        k (int): Number of words per shingle
+
+    Returns:
+        Set[str]: Normalised shingles (lowercased, punctuation stripped)
+    """
+    # Rejoin words hyphenated at line breaks; different layouts break different words
+    text = re.sub(r'(\w)-[ \t]*\r?\n\s*(\w)', r'\1\2', text)
+    words = re.findall(r'\w+', text.lower())
+    if not words:
+        return set()
+    if len(words) < k:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+def compute_minhash(shingles: Set[str]) -> Optional[np.ndarray]:
+    """
+    Compute a MinHash signature for a set of shingles.
+
+    Args:
+        shingles (Set[str]): Shingles produced by shingle_text
+
+    Returns:
+        Optional[np.ndarray]: Signature of length NUM_PERM, or None for an empty set
+    """
+    if not shingles:
+        return None
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    hashes %= _MERSENNE_PRIME
+    signature = np.full(NUM_PERM, _MERSENNE_PRIME, dtype=np.uint64)
+    # (a * x + b) mod p for every permutation/shingle pair, taking the column minimum
+    # one block at a time so large documents don't materialise an n_shingles x NUM_PERM matrix
+    for start in range(0, len(hashes), MINHASH_BLOCK_SIZE):
+        permuted = np.outer(hashes[start:start + MINHASH_BLOCK_SIZE], _PERM_A)
+        permuted += _PERM_B
+        permuted %= _MERSENNE_PRIME
+        np.minimum(signature, permuted.min(axis=0), out=signature)
+    return signature
+
+def compute_file_signature(file_path: str) -> Optional[np.ndarray]:
+    """Extract text from a document and return its MinHash signature."""
+    return compute_minhash(shingle_text(extract_text_from_file(file_path)))
+
+def lsh_layout(threshold: float, recall: float = LSH_RECALL) -> Tuple[int, int]:
+    """
+    Choose the LSH band layout for a similarity threshold.
+
+    Picks the most selective layout (most rows per band) for which a pair at exactly
+    the threshold still becomes a candidate with probability at least recall. Extra
+    candidates are cheap because they are verified against the threshold afterwards.
+
+    Args:
+        threshold (float): Estimated Jaccard similarity that counts as a near-duplicate
+        recall (float): Required candidate probability at the threshold
+
+    Returns:
+        Tuple[int, int]: (bands, rows) with bands * rows <= NUM_PERM
+    """
+    for rows in range(NUM_PERM, 0, -1):
+        bands = NUM_PERM // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return NUM_PERM, 1
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimate the Jaccard similarity of two documents from their signatures."""
+    return float(np.mean(sig_a == sig_b))
+
+class DuplicateIndex:
+    """
+    LSH index over MinHash signatures that groups near-duplicate documents into clusters.
+
+    Documents are keyed by filename. The first document added to a cluster is its
+    canonical copy; every later member is treated as a duplicate of it.
+    """
+
+    def __init__(self, threshold: float = DUPLICATE_THRESHOLD):
+        self.threshold = threshold
+        self.num_bands, self.rows = lsh_layout(threshold)
+        self.buckets: List[Dict[bytes, Set[str]]] = [{} for _ in range(self.num_bands)]
+        self.signatures: Dict[str, Optional[np.ndarray]] = {}
+        self.mtimes: Dict[str, float] = {}
+        self.cluster_of: Dict[str, int] = {}
+        self.cluster_members: Dict[int, List[str]] = {}
+        self._next_cluster = 0
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes()
+                for i in range(self.num_bands)]
+
+    def query(self, signature: Optional[np.ndarray]) -> List[str]:
+        """Return indexed documents whose estimated similarity meets the threshold."""
+        if signature is None:
+            return []
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+        return [name for name in candidates
+                if estimate_similarity(signature, self.signatures[name]) >= self.threshold]
+
+    def add(self, name: str, signature: Optional[np.ndarray], mtime: float = 0.0) -> List[str]:
+        """
+        Index a document and attach it to the cluster of its near-duplicates.
+
+        Args:
+            name (str): Document key (filename)
+            signature (Optional[np.ndarray]): MinHash signature, None if the document has no text
+            mtime (float): Modification time of the file, used to detect changes
+
+        Returns:
+            List[str]: Previously indexed documents the new one duplicates
+        """
+        old_cluster = self.cluster_of.get(name)
+        if name in self.signatures:
+            self._unindex_signature(name)
+
+        duplicates = [d for d in self.query(signature) if d != name]
+        if old_cluster is not None:
+            members = self.cluster_members[old_cluster]
+            # A re-indexed document keeps its cluster and position while it still matches,
+            # otherwise re-ingesting the canonical copy would demote it to a duplicate
+            still_matches = any(self.cluster_of[d] == old_cluster for d in duplicates)
+            if not still_matches and (len(members) > 1 or duplicates):
+                self._leave_cluster(name)
+                old_cluster = None
+
+        if old_cluster is not None:
+            cluster_id = old_cluster
+        elif duplicates:
+            # Join the oldest matching cluster so the canonical copy stays stable
+            cluster_id = min(self.cluster_of[d] for d in duplicates)
+            self.cluster_members[cluster_id].append(name)
+        else:
+            cluster_id = self._next_cluster
+            self._next_cluster += 1
+            self.cluster_members[cluster_id] = [name]
+
+        self.cluster_of[name] = cluster_id
+        self.signatures[name] = signature
+        self.mtimes[name] = mtime
+        if signature is not None:
+            for band, key in enumerate(self._band_keys(signature)):
+                self.buckets[band].setdefault(key, set()).add(name)
+        return duplicates
+
+    def add_file(self, file_path: str) -> List[str]:
+        """Compute the signature of a file on disk and add it to the index."""
+        return self.add(os.path.basename(file_path), compute_file_signature(file_path),
+                        os.path.getmtime(file_path))
+
+    def _unindex_signature(self, name: str):
+        signature = self.signatures.pop(name, None)
+        self.mtimes.pop(name, None)
+        if signature is not None:
+            for band, key in enumerate(self._band_keys(signature)):
+                bucket = self.buckets[band].get(key)
+                if bucket:
+                    bucket.discard(name)
+                    if not bucket:
+                        del self.buckets[band][key]
+
+    def _leave_cluster(self, name: str):
+        cluster_id = self.cluster_of.pop(name, None)
+        if cluster_id is not None:
+            members = self.cluster_members[cluster_id]
+            members.remove(name)
+            if not members:
+                del self.cluster_members[cluster_id]
+
+    def remove(self, name: str):
+        """Drop a document from the index."""
+        self._unindex_signature(name)
+        self._leave_cluster(name)
+
+    def sync_folder(self, folder: str):
+        """Index new or modified documents in a folder and forget deleted ones."""
+        present = {}
+        for filename in os.listdir(folder):
+            if filename.endswith(('.pdf', '.docx')):
+                present[filename] = os.path.getmtime(os.path.join(folder, filename))
+        # Index oldest files first so the earliest ingested copy becomes canonical
+        for filename in sorted(present, key=lambda name: (present[name], name)):
+            if self.mtimes.get(filename) != present[filename]:
+                self.add_file(os.path.join(folder, filename))
+        for name in list(self.signatures):
+            if name not in present:
+                self.remove(name)
+
+    def canonical(self, name: str) -> str:
+        """Return the canonical document of the cluster a document belongs to."""
+        cluster_id = self.cluster_of.get(name)
+        if cluster_id is None:
+            return name
+        return self.cluster_members[cluster_id][0]
+
+    def is_duplicate(self, name: str) -> bool:
+        """Whether a document is a near-duplicate of an earlier, canonical document."""
+        return self.canonical(name) != name
+
+    def get_cluster(self, name: str) -> List[str]:
+        """Return all documents in the same cluster, canonical first."""
+        cluster_id = self.cluster_of.get(name)
+        if cluster_id is None:
+            return [name]
+        return list(self.cluster_members[cluster_id])
+
+    def find_duplicate_in(self, name: str, names) -> Optional[str]:
+        """Return another member of a document's cluster that is in names, if any."""
+        for member in self.get_cluster(name):
+            if member != name and member in names:
+                return member
+        return None
+
+    def clusters(self) -> List[List[str]]:
+        """Return every cluster holding more than one document."""
+        return [list(members) for members in self.cluster_members.values() if len(members) > 1]
@@ -24,6 +24,41 @@ def extract_title_from_docx(file_path):
             return para.text.strip()
     return "No Title"
 
+def extract_text_segments(file_path: str) -> List[Tuple[str, int, str]]:
+    """
+    Extract the text of a PDF or DOCX document split into pages or paragraphs.
+    
+    Args:
+        file_path (str): Path to the document
+    
+    Returns:
+        List[Tuple[str, int, str]]: (unit, number, text) where unit is 'page' or 'paragraph'
+            and number is 1-based. Empty for unsupported file types.
+    """
+    if file_path.endswith('.pdf'):
+        with fitz.open(file_path) as doc:
+            return [('page', page_num + 1, page.get_text()) for page_num, page in enumerate(doc)]
+    elif file_path.endswith('.docx'):
+        doc = docx.Document(file_path)
+        return [('paragraph', para_num + 1, para.text + "\n") for para_num, para in enumerate(doc.paragraphs)]
+    return []
+
+def extract_text_from_file(file_path: str) -> str:
+    """
+    Extract the full plain text of a PDF or DOCX document.
+    
+    Args:
+        file_path (str): Path to the document
+    
+    Returns:
+        str: The document text, or an empty string for unsupported or unreadable files
+    """
+    try:
+        return "".join(text for _, _, text in extract_text_segments(file_path))
+    except Exception as e:
+        print(f"Error extracting text: {str(e)}")
+        return ""
+
 def search_text_in_file(file_path: str, keyword: str) -> Tuple[bool, str, List[Dict], str]:
     """
     Search for text in a document and return matches information and the keyword.
@@ -52,36 +87,18 @@ def search_text_in_file(file_path: str, keyword: str) -> Tuple[bool, str, List[D
         search_pattern = r'(?:^|\W)' + escaped_keyword + r'(?:\W|$)'
         print(f"Using pattern: {search_pattern}")  # Debug print
 
-        if file_path.endswith('.pdf'):
-            doc = fitz.open(file_path)
-            full_text = ""
-            for page_num, page in enumerate(doc):
-                text = page.get_text()
-                full_text += text
-                # Find matches with their positions
-                for match in re.finditer(search_pattern, text, re.IGNORECASE):
-                    # Store basic match info. Exact highlighting will be done in highlight_text
-                    matches.append({
-                        'page': page_num + 1,
-                        'start': match.start(), # Keep original positions for context if needed
-                        'end': match.end(),
-                        'text': match.group()
-                    })
-        elif file_path.endswith('.docx'):
-            doc = docx.Document(file_path)
-            full_text = ""
-            for para_num, para in enumerate(doc.paragraphs):
-                text = para.text + "\n"
-                full_text += text
-                # Find matches with their positions
-                for match in re.finditer(search_pattern, text, re.IGNORECASE):
-                    # Store basic match info. Exact highlighting will be done in highlight_text
-                    matches.append({
-                        'paragraph': para_num + 1,
-                        'start': match.start(), # Keep original positions for context if needed
-                        'end': match.end(),
-                        'text': match.group()
-                    })
+        full_text = ""
+        for unit, number, text in extract_text_segments(file_path):
+            full_text += text
+            # Find matches with their positions
+            for match in re.finditer(search_pattern, text, re.IGNORECASE):
+                # Store basic match info. Exact highlighting will be done in highlight_text
+                matches.append({
+                    unit: number,
+                    'start': match.start(), # Keep original positions for context if needed
+                    'end': match.end(),
+                    'text': match.group()
+                })
         
         search_time = time.time() - start_time
         print(f"Search completed in {search_time:.2f} seconds, {len(matches)} matches found.")  # Debug print
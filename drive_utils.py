@@ -29,19 +29,25 @@ def get_google_drive_service():
 
     return build('drive', 'v3', credentials=creds)
 
-def upload_file_to_drive(file_path, folder_id=None):
+def upload_file_to_drive(file_path, folder_id=None, dedup_index=None, uploaded_files=None):
     """
     Upload a file to Google Drive.
     
     Args:
         file_path (str): Path to the file to upload
         folder_id (str, optional): ID of the folder to upload to
+        dedup_index (DuplicateIndex, optional): Index used to skip near-duplicate documents
+        uploaded_files (set, optional): Names of files already uploaded to Drive,
+            updated with this file's name after a successful upload
     
     Returns:
-        str: ID of the uploaded file
+        str: ID of the uploaded file, or None if a near-duplicate was already uploaded
     """
     start_time = time.time()
     
+    if dedup_index is not None and uploaded_files and dedup_index.find_duplicate_in(os.path.basename(file_path), uploaded_files):
+        return None
+    
     try:
         service = get_google_drive_service()
         file_metadata = {
@@ -62,6 +68,8 @@ def upload_file_to_drive(file_path, folder_id=None):
         upload_time = time.time() - start_time
         print(f"Upload completed in {upload_time:.2f} seconds")
         
+        if uploaded_files is not None:
+            uploaded_files.add(os.path.basename(file_path))
         return file.get('id')
     
     except Exception as e:
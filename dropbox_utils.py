@@ -29,10 +29,16 @@ def create_folder(dbx, folder_name):
     except Exception as e:
         raise Exception(f"Failed to create Dropbox folder: {str(e)}")
 
-def upload_file_to_dropbox(dbx, file_path, folder_path):
-    """Upload a file to Dropbox."""
+def upload_file_to_dropbox(dbx, file_path, folder_path, dedup_index=None, uploaded_files=None):
+    """
+    Upload a file to Dropbox. Returns None without uploading if dedup_index places it
+    in a cluster with a file already in uploaded_files; on success the file's name is
+    added to uploaded_files.
+    """
     try:
         file_name = os.path.basename(file_path)
+        if dedup_index is not None and uploaded_files and dedup_index.find_duplicate_in(file_name, uploaded_files):
+            return None
         dropbox_path = f"{folder_path}/{file_name}"
         
         # Check if file already exists
@@ -58,6 +64,8 @@ def upload_file_to_dropbox(dbx, file_path, folder_path):
         with open(file_path, 'rb') as f:
             dbx.files_upload(f.read(), dropbox_path)
         
+        if uploaded_files is not None:
+            uploaded_files.add(file_name)
         return dropbox_path
     except Exception as e:
         raise Exception(f"Failed to upload file to Dropbox: {str(e)}")
@@ -4,7 +4,7 @@ import pandas as pd
 import time
 import requests
 from bs4 import BeautifulSoup # Import BeautifulSoup
-from doc_utils import extract_title_from_pdf, extract_title_from_docx, search_text_in_file, highlight_text
+from doc_utils import extract_title_from_pdf, extract_title_from_docx, search_text_in_file, highlight_text, extract_text_from_file
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.model_selection import train_test_split
@@ -13,6 +13,7 @@ import pickle
 from collections import Counter # Import Counter
 from urllib.parse import urljoin
 from dropbox_utils import get_dropbox_client, create_folder, upload_file_to_dropbox, list_dropbox_files
+from dedup_utils import DuplicateIndex
 
 # Configuration
 DOC_FOLDER = 'sample_documents'
@@ -35,8 +36,20 @@ if 'dropbox_client' not in st.session_state:
 if 'uploaded_files_dropbox' not in st.session_state:
     st.session_state.uploaded_files_dropbox = set()
 
+# Names of files that actually reached Dropbox, used to skip near-duplicate uploads
+if 'dropbox_file_names' not in st.session_state:
+    st.session_state.dropbox_file_names = set()
+
 st.title("📄 Cloud Document Analytics")
 
+# Initialize near-duplicate index (MinHash signatures bucketed with LSH)
+# Seed it from documents saved in earlier sessions so new ingests are checked against them
+if 'dedup_index' not in st.session_state:
+    with st.spinner("Indexing stored documents for duplicate detection..."):
+        dedup_index = DuplicateIndex()
+        dedup_index.sync_folder(DOC_FOLDER)
+    st.session_state.dedup_index = dedup_index
+
 # Dropbox Authentication Section
 st.header("🔐 Dropbox Authentication")
 dropbox_token = st.text_input("Enter your Dropbox Access Token:", type="password")
@@ -63,6 +76,13 @@ if uploaded_files:
             st.success(f"✅ Created Dropbox folder: {DROPBOX_FOLDER_NAME}")
         except Exception as e:
             st.warning(f"⚠️ Dropbox folder creation failed: {e}")
+    if dropbox_folder_path:
+        try:
+            # Include files uploaded in earlier sessions
+            st.session_state.dropbox_file_names.update(
+                f['name'] for f in list_dropbox_files(st.session_state.dropbox_client, dropbox_folder_path))
+        except Exception as e:
+            st.warning(f"⚠️ Could not list existing Dropbox files: {e}")
     
     for file in uploaded_files:
         # Check if the file has already been uploaded to Dropbox in this session
@@ -74,11 +94,21 @@ if uploaded_files:
         with open(file_path, 'wb') as f:
             f.write(file.read())
         
+        # Index the document so near-duplicates of earlier documents can be detected
+        duplicates = st.session_state.dedup_index.add_file(file_path)
+        if duplicates:
+            st.info(f"ℹ️ {file.name} is a near-duplicate of {', '.join(duplicates)}.")
+        
         # Upload to Dropbox if connected
         if st.session_state.dropbox_client and dropbox_folder_path:
             try:
-                dropbox_path = upload_file_to_dropbox(st.session_state.dropbox_client, file_path, dropbox_folder_path)
-                st.success(f"✅ Uploaded {file.name} to Dropbox")
+                dropbox_path = upload_file_to_dropbox(st.session_state.dropbox_client, file_path, dropbox_folder_path,
+                                                      dedup_index=st.session_state.dedup_index,
+                                                      uploaded_files=st.session_state.dropbox_file_names)
+                if dropbox_path:
+                    st.success(f"✅ Uploaded {file.name} to Dropbox")
+                else:
+                    st.info(f"ℹ️ Skipped Dropbox upload for {file.name}: a near-duplicate is already uploaded")
                 # Add filename to session state to track that it's uploaded
                 st.session_state.uploaded_files_dropbox.add(file.name)
             except Exception as e:
@@ -135,6 +165,10 @@ if st.button("Fetch Document(s)"):
 
                     st.success(f"✅ Fetched and added {filename} from web!")
 
+                    duplicates = st.session_state.dedup_index.add_file(file_path)
+                    if duplicates:
+                        st.info(f"ℹ️ {filename} is a near-duplicate of {', '.join(duplicates)}.")
+
                     # Note: You would ideally upload to Dropbox here if enabled
 
                 
@@ -200,6 +234,10 @@ if st.button("Fetch Document(s)"):
                                     f.write(response.content)
                                 
                                 st.success(f"Downloaded: {filename}")
+
+                                duplicates = st.session_state.dedup_index.add_file(file_path)
+                                if duplicates:
+                                    st.info(f"{filename} is a near-duplicate of {', '.join(duplicates)}")
                             except requests.exceptions.RequestException as e:
                                 st.error(f"Failed to download {link}: {str(e)}")
                             except Exception as e:
@@ -243,21 +281,32 @@ st.header("🔍 Document Search")
 keyword = st.text_input("Search for keyword:")
 if keyword:
     start_time = time.time()
-    results = []
+    results = {}
+    dedup_index = st.session_state.dedup_index
+    dedup_index.sync_folder(DOC_FOLDER)
     
     for filename in os.listdir(DOC_FOLDER):
         path = os.path.join(DOC_FOLDER, filename)
         found, text, matches, search_keyword = search_text_in_file(path, keyword)
         if found:
-            results.append((filename, text, search_keyword)) # Pass keyword to results
+            # Collapse hits from near-duplicates into one entry per cluster
+            results.setdefault(dedup_index.canonical(filename), []).append((filename, text, search_keyword))
     
     search_time = time.time() - start_time
     st.session_state.metrics['search_time'].append(search_time)
     
     if results:
         st.write("### Files matching search:")
-        for filename, text, search_keyword in results:
-            with st.expander(f"✅ {filename}"):
+        for canonical, hits in results.items():
+            # Show the earliest matching member of the cluster, list the other members that matched
+            cluster = dedup_index.get_cluster(canonical)
+            hits.sort(key=lambda hit: cluster.index(hit[0]) if hit[0] in cluster else len(cluster))
+            filename, text, search_keyword = hits[0]
+            label = f"✅ {filename}"
+            if len(hits) > 1:
+                matched = [hit[0] for hit in hits[1:]]
+                label += f" (+{len(matched)} near-duplicate: {', '.join(matched)})"
+            with st.expander(label):
                 highlighted_text = highlight_text(text, search_keyword)
                 st.markdown(highlighted_text, unsafe_allow_html=True)
     else:
@@ -281,16 +330,21 @@ if st.button("Classify Documents"):
     
     texts = []
     names = []
+    dedup_index = st.session_state.dedup_index
+    dedup_index.sync_folder(DOC_FOLDER)
     for filename in os.listdir(DOC_FOLDER):
         path = os.path.join(DOC_FOLDER, filename)
-        # For classification, get the full text without specific keyword search
-        _, content, _, _ = search_text_in_file(path, ".*") # Use ".*" to get all text, ignore matches/keyword
+        content = extract_text_from_file(path)
         texts.append(content)
         names.append(filename)
     
+    # Near-duplicates are kept out of training so repeated papers don't skew the model
+    is_train = [not dedup_index.is_duplicate(name) for name in names]
+    train_texts = [text for text, keep in zip(texts, is_train) if keep]
+
     # Prepare training data
     vectorizer = TfidfVectorizer(max_features=1000)
-    X = vectorizer.fit_transform(texts)
+    X_train_all = vectorizer.fit_transform(train_texts) if train_texts else None
     
     # Create labels based on category keywords
     y = []
@@ -303,17 +357,19 @@ if st.button("Classify Documents"):
         else:
             y.append('Other') # Add 'Other' category for documents without matching keywords
 
+    y_train_all = [label for label, keep in zip(y, is_train) if keep]
+
     # Check class counts before splitting
-    class_counts = Counter(y)
+    class_counts = Counter(y_train_all)
     can_stratify = all(count >= 2 for count in class_counts.values())
 
     if len(texts) > 0 and can_stratify:
         # Split data and train model only if stratification is possible
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+        X_train, X_test, y_train, y_test = train_test_split(X_train_all, y_train_all, test_size=0.2, random_state=42, stratify=y_train_all)
         model = MultinomialNB()
         model.fit(X_train, y_train)
-        # Make predictions on the full dataset for display
-        predictions = model.predict(X)
+        # Make predictions on the full dataset (duplicates included) for display
+        predictions = model.predict(vectorizer.transform(texts))
 
         # Display results
         st.write("### Classification Results:")
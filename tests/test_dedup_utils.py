@@ -0,0 +1,183 @@
+import os
+import random
+import docx
+import numpy as np
+import pytest
+from dedup_utils import (NUM_PERM, LSH_RECALL, shingle_text, compute_minhash, estimate_similarity,
+                         lsh_layout, DuplicateIndex)
+
+def make_text(seed, n_words=2000):
+    rng = random.Random(seed)
+    return " ".join(f"w{rng.randint(0, 10000)}" for _ in range(n_words))
+
+def near_copy(text, n_changed=20):
+    """Return text with its last n_changed words replaced, like an extra header or footer."""
+    words = text.split()
+    return " ".join(words[:-n_changed] + ["changed"] * n_changed)
+
+def make_prose(seed, n_words=1500):
+    rng = random.Random(seed)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 12))) for _ in range(n_words)]
+
+def reflow(words, width):
+    """Lay words out in lines of width characters, hyphenating words that overflow a line."""
+    lines, line = [], ""
+    for word in words:
+        if line and len(line) + 1 + len(word) > width:
+            room = width - len(line) - 2
+            if room >= 2 and len(word) - room >= 2:
+                lines.append(f"{line} {word[:room]}-")
+                line = word[room:]
+                continue
+            lines.append(line)
+            line = word
+        else:
+            line = f"{line} {word}" if line else word
+    lines.append(line)
+    return "\n".join(lines)
+
+def signature(text):
+    return compute_minhash(shingle_text(text))
+
+def write_docx(path, text, mtime):
+    doc = docx.Document()
+    doc.add_paragraph(text)
+    doc.save(path)
+    os.utime(path, (mtime, mtime))
+
+def test_shingle_text_normalises_and_overlaps():
+    assert shingle_text("The quick, brown FOX jumps!", k=3) == {
+        "the quick brown", "quick brown fox", "brown fox jumps"}
+
+def test_shingle_text_short_and_empty():
+    assert shingle_text("two words", k=5) == {"two words"}
+    assert shingle_text("  ...  ") == set()
+
+def test_shingle_text_rejoins_line_break_hyphenation():
+    assert shingle_text("fast compu-\ntation here", k=3) == {"fast computation here"}
+    words = make_prose(20)
+    two_column, single_column = reflow(words, 40), reflow(words, 90)
+    assert "-\n" in two_column and "-\n" in single_column
+    assert shingle_text(two_column) == shingle_text(single_column) == shingle_text(" ".join(words))
+
+def test_compute_minhash_is_deterministic():
+    sig = signature(make_text(1))
+    assert sig.shape == (NUM_PERM,)
+    assert np.array_equal(sig, signature(make_text(1)))
+    assert compute_minhash(set()) is None
+
+def test_compute_minhash_blocks_match_single_pass(monkeypatch):
+    shingles = shingle_text(make_text(2, n_words=5000))
+    expected = compute_minhash(shingles)
+    monkeypatch.setattr("dedup_utils.MINHASH_BLOCK_SIZE", 7)
+    assert np.array_equal(compute_minhash(shingles), expected)
+
+def test_estimate_similarity():
+    text = make_text(3)
+    assert estimate_similarity(signature(text), signature(text)) == 1.0
+    assert estimate_similarity(signature(text), signature(near_copy(text))) > 0.8
+    assert estimate_similarity(signature(text), signature(make_text(4))) < 0.2
+
+@pytest.mark.parametrize("threshold", [0.5, 0.7, 0.8, 0.9])
+def test_lsh_layout_meets_recall_at_threshold(threshold):
+    bands, rows = lsh_layout(threshold)
+    assert bands * rows <= NUM_PERM
+    assert 1 - (1 - threshold ** rows) ** bands >= LSH_RECALL
+    # One more row per band would fall below the required recall
+    tighter_bands = NUM_PERM // (rows + 1)
+    assert 1 - (1 - threshold ** (rows + 1)) ** tighter_bands < LSH_RECALL
+
+def test_lsh_layout_loosens_for_lower_thresholds():
+    assert lsh_layout(0.5)[1] < lsh_layout(0.8)[1] < lsh_layout(0.9)[1]
+
+def test_index_finds_reflowed_copy():
+    words = make_prose(21)
+    index = DuplicateIndex()
+    index.add("arxiv.pdf", signature(reflow(words, 90)))
+    assert index.add("publisher.pdf", signature(reflow(words, 40))) == ["arxiv.pdf"]
+
+def test_index_clusters_near_duplicates():
+    text = make_text(5)
+    index = DuplicateIndex()
+    assert index.add("A.pdf", signature(text)) == []
+    assert index.add("B.pdf", signature(near_copy(text))) == ["A.pdf"]
+    assert index.add("C.pdf", signature(make_text(6))) == []
+    assert index.add("D.pdf", None) == []
+
+    assert index.clusters() == [["A.pdf", "B.pdf"]]
+    assert index.canonical("B.pdf") == "A.pdf"
+    assert index.is_duplicate("B.pdf")
+    assert not index.is_duplicate("A.pdf")
+    assert not index.is_duplicate("D.pdf")
+    assert index.get_cluster("C.pdf") == ["C.pdf"]
+
+def test_readding_canonical_keeps_its_slot():
+    text = make_text(7)
+    index = DuplicateIndex()
+    index.add("A.pdf", signature(text))
+    index.add("B.pdf", signature(near_copy(text)))
+
+    assert index.add("A.pdf", signature(text)) == ["B.pdf"]
+    assert index.get_cluster("A.pdf") == ["A.pdf", "B.pdf"]
+    assert not index.is_duplicate("A.pdf")
+    assert index.is_duplicate("B.pdf")
+
+def test_readding_changed_document_leaves_cluster():
+    text = make_text(8)
+    index = DuplicateIndex()
+    index.add("A.pdf", signature(text))
+    index.add("B.pdf", signature(near_copy(text)))
+    index.add("C.pdf", signature(make_text(9)))
+
+    # A now has unrelated content: B becomes canonical and A starts its own cluster
+    index.add("A.pdf", signature(make_text(10)))
+    assert index.get_cluster("B.pdf") == ["B.pdf"]
+    assert index.get_cluster("A.pdf") == ["A.pdf"]
+
+    # C now copies B: it leaves its singleton cluster and joins B's
+    index.add("C.pdf", signature(near_copy(near_copy(text), 5)))
+    assert index.get_cluster("B.pdf") == ["B.pdf", "C.pdf"]
+
+def test_remove_promotes_next_member():
+    text = make_text(11)
+    index = DuplicateIndex()
+    index.add("A.pdf", signature(text))
+    index.add("B.pdf", signature(near_copy(text)))
+    index.remove("A.pdf")
+
+    assert index.canonical("B.pdf") == "B.pdf"
+    assert index.query(signature(text)) == ["B.pdf"]
+    assert index.clusters() == []
+
+def test_find_duplicate_in():
+    text = make_text(12)
+    index = DuplicateIndex()
+    index.add("A.pdf", signature(text))
+    index.add("B.pdf", signature(near_copy(text)))
+
+    assert index.find_duplicate_in("B.pdf", {"A.pdf"}) == "A.pdf"
+    assert index.find_duplicate_in("A.pdf", {"A.pdf"}) is None
+    assert index.find_duplicate_in("A.pdf", set()) is None
+
+def test_sync_folder_indexes_oldest_first_and_forgets_deleted(tmp_path):
+    text = make_text(13, n_words=500)
+    write_docx(tmp_path / "publisher.docx", near_copy(text), mtime=2000)
+    write_docx(tmp_path / "arxiv.docx", text, mtime=1000)
+    write_docx(tmp_path / "other.docx", make_text(14, n_words=500), mtime=3000)
+    (tmp_path / "notes.txt").write_text(text)
+
+    index = DuplicateIndex()
+    index.sync_folder(str(tmp_path))
+    assert index.clusters() == [["arxiv.docx", "publisher.docx"]]
+    assert "notes.txt" not in index.signatures
+
+    # Touching the canonical file re-indexes it without demoting it
+    os.utime(tmp_path / "arxiv.docx", (4000, 4000))
+    index.sync_folder(str(tmp_path))
+    assert index.canonical("publisher.docx") == "arxiv.docx"
+
+    os.remove(tmp_path / "arxiv.docx")
+    index.sync_folder(str(tmp_path))
+    assert index.clusters() == []
+    assert "arxiv.docx" not in index.signatures